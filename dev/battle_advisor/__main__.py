@@ -0,0 +1,8 @@
+"""
+AI Battle Advisor - Module Entry Point
+Run the advisor with `python -m battle_advisor` from the dev folder.
+"""
+from .main import main
+
+if __name__ == "__main__":
+    main()
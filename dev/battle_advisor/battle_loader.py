@@ -5,6 +5,7 @@ Loads battle data from log files and CSV to create a GameState.
 import os
 import sys
 import re
+from itertools import chain
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -110,7 +111,7 @@ class BattleLoader:
         
         # Update left team HP
         for match in hp_pattern.finditer(left_line):
-            char_id = match.group(1).replace('_l', '')  # Remove team suffix
+            char_id = match.group(1).removesuffix('_l')  # Remove team suffix
             current_hp = int(match.group(2))
             max_hp = int(match.group(3))
             
@@ -121,7 +122,7 @@ class BattleLoader:
         
         # Update right team HP
         for match in hp_pattern.finditer(right_line):
-            char_id = match.group(1).replace('_r', '')  # Remove team suffix
+            char_id = match.group(1).removesuffix('_r')  # Remove team suffix
             current_hp = int(match.group(2))
             max_hp = int(match.group(3))
             
@@ -169,7 +170,7 @@ class BattleLoader:
                 char_stats[char_id][stat_map[stat_name]] = int(final_value)
         
         # Apply to teams
-        for char in left_team + right_team:
+        for char in chain(left_team, right_team):
             char_id = char['id']
             if char_id in char_stats:
                 for stat, value in char_stats[char_id].items():
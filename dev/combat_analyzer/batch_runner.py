@@ -0,0 +1,148 @@
+"""
+Batch Runner Module
+Analyzes many battle logs in one submission through the OpenAI Batch API.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .battle_parser import parse_battle_log
+from .metrics import BattleMetrics, compute_battle_metrics
+from .llm_analyzer import BattleAnalyzer
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch statuses after which polling stops
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_lines(log_paths: List[str], analyzer: BattleAnalyzer,
+                      metrics_by_path: Optional[Dict[str, BattleMetrics]] = None) -> Dict[str, dict]:
+    """
+    Parse each log and build its Batch API request line.
+
+    Args:
+        log_paths: Battle log files to include.
+        analyzer: Analyzer providing the request settings.
+        metrics_by_path: Already computed metrics; when given, only these
+            logs are used and nothing is parsed here.
+
+    Returns:
+        Mapping of custom_id -> {"log_path": ..., "request": ...}.
+        Logs that fail to parse are reported and skipped.
+    """
+    requests = {}
+
+    for i, log_path in enumerate(log_paths, 1):
+        if metrics_by_path is not None:
+            metrics = metrics_by_path.get(log_path)
+            if metrics is None:
+                continue
+        else:
+            try:
+                battle = parse_battle_log(log_path)
+                metrics = compute_battle_metrics(battle)
+            except Exception as e:
+                print(f"❌ Skipping {log_path}: {str(e)}")
+                continue
+
+        # custom_id must be unique within a batch; the same battle id can
+        # appear in several data folders
+        battle_id = Path(log_path).stem.replace("client_battle_log_", "")
+        custom_id = f"{i}-{battle_id}"
+
+        requests[custom_id] = {
+            "log_path": log_path,
+            "request": {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": analyzer.build_metrics_request_body(metrics)
+            }
+        }
+
+    return requests
+
+
+def _parse_output_lines(text: str) -> Dict[str, str]:
+    """Map custom_id -> analysis text (or error message) from a batch output file."""
+    results = {}
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+
+        item = json.loads(line)
+        custom_id = item.get("custom_id")
+        response = item.get("response") or {}
+        body = response.get("body") or {}
+
+        if item.get("error") or response.get("status_code") != 200:
+            error = item.get("error") or body.get("error") or {}
+            message = error.get("message", "unknown error") if isinstance(error, dict) else str(error)
+            results[custom_id] = f"Error analyzing battle: {message}"
+        else:
+            results[custom_id] = body["choices"][0]["message"]["content"]
+
+    return results
+
+
+def analyze_batch(log_paths: List[str], analyzer: Optional[BattleAnalyzer] = None,
+                  poll_interval: float = 10.0,
+                  metrics_by_path: Optional[Dict[str, BattleMetrics]] = None) -> Dict[str, str]:
+    """
+    Analyze multiple battle logs through the OpenAI Batch API.
+
+    All prompts are uploaded as a single JSONL file and submitted as one
+    batch, which is then polled until it finishes.
+
+    Args:
+        log_paths: Battle log files to analyze.
+        analyzer: Analyzer providing the client and request settings.
+        poll_interval: Seconds between batch status checks.
+        metrics_by_path: Already computed metrics (see build_batch_lines).
+
+    Returns:
+        Mapping of log path -> analysis text (or an error message).
+    """
+    analyzer = analyzer or BattleAnalyzer()
+    client = analyzer.client
+
+    requests = build_batch_lines(log_paths, analyzer, metrics_by_path)
+    if not requests:
+        return {}
+
+    payload = "\n".join(json.dumps(r["request"]) for r in requests.values()) + "\n"
+
+    input_file = client.files.create(
+        file=("battles.jsonl", payload.encode("utf-8")),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h"
+    )
+    print(f"📤 Submitted batch {batch.id} with {len(requests)} battles")
+
+    while batch.status not in TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        if counts:
+            print(f"⏳ Batch {batch.status}: {counts.completed}/{counts.total} done")
+
+    outputs = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            outputs.update(_parse_output_lines(client.files.content(file_id).text))
+
+    results = {}
+    for custom_id, entry in requests.items():
+        results[entry["log_path"]] = outputs.get(
+            custom_id, f"Error analyzing battle: batch {batch.status} without a result"
+        )
+
+    return results
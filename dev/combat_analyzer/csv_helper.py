@@ -5,11 +5,59 @@ Loads character and skill data from CSV files to enrich battle analysis.
 import os
 import csv
 import re
-from dataclasses import dataclass, field
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from dataclasses import dataclass, field, fields
 from typing import Optional, Dict, List
 from pathlib import Path
 
 
+DATABASE_CSV = "[LT] Toon Kits - _DATABASE.csv"
+SKILLS_SUMMARY_CSV = "[LT] Toon Kits - _SKILLS SUMMARY.csv"
+
+# Parsed-CSV cache written next to the CSV files. Bump the version whenever
+# the parsing rules change so stale caches are rebuilt.
+CACHE_FILE = ".csv_cache.json"
+CACHE_VERSION = 2
+
+# DATABASE.csv columns that may be absent; only 'Character ID' is required
+DATABASE_OPTIONAL_COLUMNS = (
+    'Ref. Character', 'Skill ID', 'Skill Name', 'Skill Level', 'Type / Cost',
+    'Description', 'Is Max TU', 'Theme', 'Theme 2', 'Rarity', 'Archetype',
+    'Race', 'Family', 'Region', 'House', 'Attack', 'Defense', 'Health',
+    'Speed', 'Total Power'
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_int(value: str) -> int:
+    """
+    Safely parse integer from string.
+    
+    The CSV columns hold a small set of repeated values (skill levels, shared
+    stat numbers), so results are memoized per distinct cell text.
+    """
+    if not value:
+        return 0
+    try:
+        # Remove commas and parse
+        return int(value.replace(',', '').strip())
+    except (ValueError, AttributeError):
+        return 0
+
+
+def _shorten_description(description: str, limit: int = 200) -> str:
+    """Cap a skill description for LLM context."""
+    return description[:limit] + "..." if len(description) > limit else description
+
+
+def _init_field_names(cls) -> List[str]:
+    """Names of a dataclass's __init__ fields, in positional order."""
+    return [f.name for f in fields(cls) if f.init]
+
+
 @dataclass
 class SkillInfo:
     """Information about a skill."""
@@ -21,6 +69,7 @@ class SkillInfo:
     description: str = ""
     owner_character: str = ""
     is_max_level: bool = False
+    description_short: str = ""  # description capped at 200 chars for LLM context
 
 
 @dataclass 
@@ -61,8 +110,17 @@ class CharacterCSVInfo:
     # Skills
     skills: List[SkillInfo] = field(default_factory=list)
     
+    # Rendered summary, built on first use (data is immutable after load)
+    _summary_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
     def get_summary(self) -> str:
         """Get a text summary for LLM context."""
+        if self._summary_cache is None:
+            self._summary_cache = self._build_summary()
+        return self._summary_cache
+    
+    def _build_summary(self) -> str:
+        """Render the text summary."""
         parts = [f"**{self.display_name}**"]
         
         attrs = []
@@ -90,12 +148,14 @@ class CharacterCSVInfo:
 class CSVDataLoader:
     """Loads and caches data from CSV files."""
     
-    def __init__(self, csv_dir: str = None):
+    def __init__(self, csv_dir: str = None, use_cache: bool = True):
         """
         Initialize CSV loader.
         
         Args:
             csv_dir: Directory containing CSV files. Defaults to sourse folder.
+            use_cache: Read/write a parsed cache next to the CSV files so later
+                processes skip CSV parsing while the files are unchanged.
         """
         if csv_dir:
             self.csv_dir = Path(csv_dir)
@@ -105,8 +165,17 @@ class CSVDataLoader:
         
         self._characters: Dict[str, CharacterCSVInfo] = {}
         self._skills: Dict[str, SkillInfo] = {}
-        self._skills_by_character: Dict[str, List[SkillInfo]] = {}
+        self._skills_by_character: Dict[str, List[SkillInfo]] = defaultdict(list)
         self._loaded = False
+        self._load_lock = threading.Lock()
+        self.use_cache = use_cache
+        self._cache_path = self.csv_dir / CACHE_FILE
+        
+        # Resolved lookups (including fuzzy matches and misses), so repeated
+        # queries for the same ID are a single dict hit
+        self._character_matches: Dict[str, Optional[CharacterCSVInfo]] = {}
+        self._skill_matches: Dict[str, Optional[SkillInfo]] = {}
+        self._character_skill_matches: Dict[str, List[SkillInfo]] = {}
     
     def _clean_description(self, desc: str) -> str:
         """Clean up skill description by removing markup tags."""
@@ -121,130 +190,296 @@ class CSVDataLoader:
     
     def _parse_int(self, value: str) -> int:
         """Safely parse integer from string."""
-        if not value:
-            return 0
-        try:
-            # Remove commas and parse
-            return int(value.replace(',', '').strip())
-        except (ValueError, AttributeError):
-            return 0
+        return _parse_int(value)
     
-    def load_database_csv(self):
-        """Load the DATABASE.csv file with character and skill info."""
-        csv_path = self.csv_dir / "[LT] Toon Kits - _DATABASE.csv"
+    def _iter_database_rows(self):
+        """
+        Yield rows of the DATABASE.csv file as lists of cells.
+        
+        The first row yielded is the column header.
+        """
+        csv_path = self.csv_dir / DATABASE_CSV
         
         if not csv_path.exists():
             print(f"Warning: DATABASE CSV not found at {csv_path}")
             return
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
             # Skip the header row with column groups
             next(f)
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                try:
-                    char_id = row.get('Character ID', '').strip()
-                    if not char_id:
-                        continue
-                    
-                    # Create or update character
-                    if char_id not in self._characters:
-                        self._characters[char_id] = CharacterCSVInfo(
-                            character_id=char_id,
-                            display_name=row.get('Ref. Character', '').strip(),
-                            theme=row.get('Theme', '').strip(),
-                            theme2=row.get('Theme 2', '').strip(),
-                            rarity=row.get('Rarity', '').strip(),
-                            archetype=row.get('Archetype', '').strip(),
-                            race=row.get('Race', '').strip(),
-                            family=row.get('Family', '').strip(),
-                            region=row.get('Region', '').strip(),
-                            house=row.get('House', '').strip(),
-                            base_attack=self._parse_int(row.get('Attack', '')),
-                            base_defense=self._parse_int(row.get('Defense', '')),
-                            base_health=self._parse_int(row.get('Health', '')),
-                            base_speed=self._parse_int(row.get('Speed', '')),
-                            total_power=self._parse_int(row.get('Total Power', ''))
-                        )
-                        
-                        # Handle relative stats (they appear after base stats with same names)
-                        # The CSV has duplicate column names, so we need to handle this
-                    
-                    # Create skill
-                    skill_id = row.get('Skill ID', '').strip()
-                    if skill_id:
-                        skill_level = row.get('Skill Level', '').strip()
-                        skill = SkillInfo(
-                            skill_id=skill_id,
-                            skill_name=row.get('Skill Name', '').strip(),
-                            skill_level=self._parse_int(skill_level) if skill_level else 0,
-                            skill_type=row.get('Type / Cost', '').strip(),
-                            description=row.get('Description', '').strip(),
-                            owner_character=row.get('Ref. Character', '').strip(),
-                            is_max_level=row.get('Is Max TU', '').strip().upper() == 'TRUE'
-                        )
-                        
-                        self._skills[skill_id] = skill
-                        
-                        # Add to character's skill list
-                        if char_id not in self._skills_by_character:
-                            self._skills_by_character[char_id] = []
-                        self._skills_by_character[char_id].append(skill)
-                        
-                except Exception as e:
-                    # Skip problematic rows
-                    continue
+            yield from csv.reader(f)
     
-    def load_skills_summary_csv(self):
-        """Load the SKILLS SUMMARY.csv file with cleaner skill descriptions."""
-        csv_path = self.csv_dir / "[LT] Toon Kits - _SKILLS SUMMARY.csv"
+    def _iter_skills_summary_rows(self):
+        """Yield rows of the SKILLS SUMMARY.csv file as lists of cells."""
+        csv_path = self.csv_dir / SKILLS_SUMMARY_CSV
         
         if not csv_path.exists():
             print(f"Warning: SKILLS SUMMARY CSV not found at {csv_path}")
             return
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            
-            for row in reader:
-                if len(row) < 4:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            yield from csv.reader(f)
+    
+    def _ingest_rows(self, db_rows, summary_rows):
+        """
+        Build characters and skills from DATABASE rows, then apply the
+        SKILLS SUMMARY rows on top (cleaner descriptions, extra skills).
+        """
+        characters = self._characters
+        skills = self._skills
+        skills_by_character = self._skills_by_character
+        
+        # Resolve column positions once from the header row. Duplicate names
+        # (base/relative/max stats) resolve to the last occurrence, the same
+        # column csv.DictReader would return.
+        db_rows = iter(db_rows)
+        header = next(db_rows, None)
+        columns = {name: i for i, name in enumerate(header or ())}
+        if 'Character ID' not in columns:
+            if header is not None:
+                print("Warning: DATABASE CSV is missing column 'Character ID'")
+            db_rows = ()
+        
+        # Other columns are optional and read as empty when absent, like
+        # DictReader's row.get(name, ''): they point at a '' cell appended
+        # to the end of every row
+        pad_rows = any(name not in columns for name in DATABASE_OPTIONAL_COLUMNS)
+        ref_character_col = columns.get('Ref. Character', -1)
+        skill_id_col = columns.get('Skill ID', -1)
+        skill_name_col = columns.get('Skill Name', -1)
+        skill_level_col = columns.get('Skill Level', -1)
+        type_cost_col = columns.get('Type / Cost', -1)
+        description_col = columns.get('Description', -1)
+        is_max_col = columns.get('Is Max TU', -1)
+        char_id_col = columns.get('Character ID', -1)
+        theme_col = columns.get('Theme', -1)
+        theme2_col = columns.get('Theme 2', -1)
+        rarity_col = columns.get('Rarity', -1)
+        archetype_col = columns.get('Archetype', -1)
+        race_col = columns.get('Race', -1)
+        family_col = columns.get('Family', -1)
+        region_col = columns.get('Region', -1)
+        house_col = columns.get('House', -1)
+        attack_col = columns.get('Attack', -1)
+        defense_col = columns.get('Defense', -1)
+        health_col = columns.get('Health', -1)
+        speed_col = columns.get('Speed', -1)
+        total_power_col = columns.get('Total Power', -1)
+        
+        for row in db_rows:
+            if pad_rows:
+                row.append('')
+            try:
+                # Reject rows without a character before any string work
+                cell = row[char_id_col]
+                if not cell or cell.isspace():
                     continue
+                char_id = cell.strip()
+                
+                # Create or update character
+                if char_id not in characters:
+                    characters[char_id] = CharacterCSVInfo(
+                        character_id=char_id,
+                        display_name=row[ref_character_col].strip(),
+                        theme=row[theme_col].strip(),
+                        theme2=row[theme2_col].strip(),
+                        rarity=row[rarity_col].strip(),
+                        archetype=row[archetype_col].strip(),
+                        race=row[race_col].strip(),
+                        family=row[family_col].strip(),
+                        region=row[region_col].strip(),
+                        house=row[house_col].strip(),
+                        base_attack=_parse_int(row[attack_col]),
+                        base_defense=_parse_int(row[defense_col]),
+                        base_health=_parse_int(row[health_col]),
+                        base_speed=_parse_int(row[speed_col]),
+                        total_power=_parse_int(row[total_power_col])
+                    )
+                    
+                    # Handle relative stats (they appear after base stats with same names)
+                    # The CSV has duplicate column names, so we need to handle this
                 
-                try:
-                    character_name = row[0].strip()
-                    skill_id = row[1].strip()
-                    skill_name = row[2].strip()
-                    description = self._clean_description(row[3]) if len(row) > 3 else ""
-                    skill_type = row[4].strip() if len(row) > 4 else ""
-                    cost = row[5].strip() if len(row) > 5 else ""
+                # Create skill
+                cell = row[skill_id_col]
+                if cell and not cell.isspace():
+                    skill_id = cell.strip()
+                    skill_level = row[skill_level_col].strip()
+                    skill = SkillInfo(
+                        skill_id=skill_id,
+                        skill_name=row[skill_name_col].strip(),
+                        skill_level=_parse_int(skill_level) if skill_level else 0,
+                        skill_type=row[type_cost_col].strip(),
+                        description=row[description_col].strip(),
+                        owner_character=row[ref_character_col].strip(),
+                        is_max_level=row[is_max_col].strip().upper() == 'TRUE'
+                    )
                     
-                    # Update existing skill or create new one
-                    if skill_id in self._skills:
-                        # Update with cleaner description
-                        self._skills[skill_id].description = description
-                    else:
-                        skill = SkillInfo(
-                            skill_id=skill_id,
-                            skill_name=skill_name,
-                            skill_type=skill_type,
-                            cost=cost,
-                            description=description,
-                            owner_character=character_name
-                        )
-                        self._skills[skill_id] = skill
-                        
-                except Exception as e:
+                    skills[skill_id] = skill
+                    
+                    # Add to character's skill list
+                    skills_by_character[char_id].append(skill)
+                    
+            except Exception as e:
+                # Skip problematic rows
+                continue
+        
+        for row in summary_rows:
+            if len(row) < 4:
+                continue
+            
+            try:
+                skill_id = row[1].strip()
+                description = self._clean_description(row[3])
+                
+                # Update existing skill with cleaner description (single lookup)
+                existing = skills.get(skill_id)
+                if existing is not None:
+                    existing.description = description
                     continue
+                
+                skills[skill_id] = SkillInfo(
+                    skill_id=skill_id,
+                    skill_name=row[2].strip(),
+                    skill_type=row[4].strip() if len(row) > 4 else "",
+                    cost=row[5].strip() if len(row) > 5 else "",
+                    description=description,
+                    owner_character=row[0].strip()
+                )
+                    
+            except Exception as e:
+                continue
+        
+        # Data changed, so previously resolved lookups may be stale
+        self._character_matches.clear()
+        self._skill_matches.clear()
+        self._character_skill_matches.clear()
+        
+        # Pre-render the truncated descriptions used in LLM context once here,
+        # rather than on every character info build
+        for skill_list in (skills.values(), *skills_by_character.values()):
+            for skill in skill_list:
+                skill.description_short = _shorten_description(skill.description)
+    
+    def load_database_csv(self):
+        """Load the DATABASE.csv file with character and skill info."""
+        self._ingest_rows(self._iter_database_rows(), ())
+    
+    def load_skills_summary_csv(self):
+        """Load the SKILLS SUMMARY.csv file with cleaner skill descriptions."""
+        self._ingest_rows((), self._iter_skills_summary_rows())
+    
+    def _cache_is_fresh(self) -> bool:
+        """Check the cache exists and is newer than both CSV files."""
+        try:
+            cache_mtime = self._cache_path.stat().st_mtime_ns
+            return all(
+                cache_mtime > (self.csv_dir / name).stat().st_mtime_ns
+                for name in (DATABASE_CSV, SKILLS_SUMMARY_CSV)
+            )
+        except OSError:
+            return False
+    
+    def _load_cache(self) -> bool:
+        """
+        Populate characters and skills from the parsed cache.
+        
+        Returns:
+            True if the cache was fresh and loaded, False otherwise.
+        """
+        if not self._cache_is_fresh():
+            return False
+        
+        try:
+            data = json.loads(self._cache_path.read_bytes())
+            if (data.get("version") != CACHE_VERSION
+                    or data["skill_fields"] != _init_field_names(SkillInfo)
+                    or data["character_fields"] != _init_field_names(CharacterCSVInfo)):
+                return False
+            
+            # Skills are stored once and referenced by position, so objects
+            # shared between the two mappings stay shared after reload
+            skill_objects = [SkillInfo(*values) for values in data["skill_objects"]]
+            characters = {
+                values[0]: CharacterCSVInfo(*values) for values in data["characters"]
+            }
+            skills = {skill_id: skill_objects[i] for skill_id, i in data["skills"].items()}
+            skills_by_character = defaultdict(list)
+            for char_id, indexes in data["skills_by_character"].items():
+                skills_by_character[char_id] = [skill_objects[i] for i in indexes]
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Warning: Ignoring unreadable CSV cache {self._cache_path}: {e}")
+            return False
+        
+        self._characters = characters
+        self._skills = skills
+        self._skills_by_character = skills_by_character
+        return True
+    
+    def _save_cache(self):
+        """Write the parsed data to the cache file atomically."""
+        skill_fields = _init_field_names(SkillInfo)
+        character_fields = _init_field_names(CharacterCSVInfo)
+        
+        positions: Dict[int, int] = {}
+        skill_objects = []
+        
+        def position(skill: SkillInfo) -> int:
+            key = id(skill)
+            if key not in positions:
+                positions[key] = len(skill_objects)
+                skill_objects.append([getattr(skill, name) for name in skill_fields])
+            return positions[key]
+        
+        data = {
+            "version": CACHE_VERSION,
+            "skill_fields": skill_fields,
+            "character_fields": character_fields,
+            "skills": {skill_id: position(s) for skill_id, s in self._skills.items()},
+            "skills_by_character": {
+                char_id: [position(s) for s in skills]
+                for char_id, skills in self._skills_by_character.items()
+            },
+            "skill_objects": skill_objects,
+            "characters": [
+                [getattr(c, name) for name in character_fields]
+                for c in self._characters.values()
+            ],
+        }
+        
+        tmp_path = self._cache_path.with_name(f"{CACHE_FILE}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self._cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            # Cache is an optimization only (e.g. read-only data directory)
+            print(f"Warning: Could not write CSV cache {self._cache_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
     
     def load_all(self):
-        """Load all CSV data."""
+        """
+        Load all CSV data.
+        
+        Safe to call from multiple threads: only one thread parses the files,
+        and the steady-state path (already loaded) never takes the lock.
+        """
         if self._loaded:
             return
         
-        self.load_database_csv()
-        self.load_skills_summary_csv()
-        self._loaded = True
+        with self._load_lock:
+            if self._loaded:
+                return
+            
+            if not (self.use_cache and self._load_cache()):
+                self._ingest_rows(self._iter_database_rows(), self._iter_skills_summary_rows())
+                if self.use_cache:
+                    self._save_cache()
+            
+            # Publish only after the dicts are fully populated, so lock-free
+            # readers never observe a partially loaded state
+            self._loaded = True
     
     def get_character(self, character_id: str) -> Optional[CharacterCSVInfo]:
         """
@@ -262,6 +497,14 @@ class CSVDataLoader:
         if normalized.endswith('_l') or normalized.endswith('_r'):
             normalized = normalized[:-2]
         
+        try:
+            return self._character_matches[normalized]
+        except KeyError:
+            match = self._character_matches[normalized] = self._find_character(normalized)
+            return match
+    
+    def _find_character(self, normalized: str) -> Optional[CharacterCSVInfo]:
+        """Resolve a normalized character ID (uncached)."""
         # Try exact match
         if normalized in self._characters:
             return self._characters[normalized]
@@ -283,6 +526,14 @@ class CSVDataLoader:
         """Get skill info by ID."""
         self.load_all()
         
+        try:
+            return self._skill_matches[skill_id]
+        except KeyError:
+            match = self._skill_matches[skill_id] = self._find_skill(skill_id)
+            return match
+    
+    def _find_skill(self, skill_id: str) -> Optional[SkillInfo]:
+        """Resolve a skill ID (uncached)."""
         # Try exact match
         if skill_id in self._skills:
             return self._skills[skill_id]
@@ -304,6 +555,14 @@ class CSVDataLoader:
         if normalized.endswith('_l') or normalized.endswith('_r'):
             normalized = normalized[:-2]
         
+        try:
+            return self._character_skill_matches[normalized]
+        except KeyError:
+            match = self._character_skill_matches[normalized] = self._find_character_skills(normalized)
+            return match
+    
+    def _find_character_skills(self, normalized: str) -> List[SkillInfo]:
+        """Resolve the skill list for a normalized character ID (uncached)."""
         # Try direct lookup
         if normalized in self._skills_by_character:
             return self._skills_by_character[normalized]
@@ -351,7 +610,7 @@ class CSVDataLoader:
                 {
                     "name": s.skill_name,
                     "type": s.skill_type,
-                    "description": s.description[:200] + "..." if len(s.description) > 200 else s.description
+                    "description": s.description_short
                 }
                 for s in max_skills[:4]  # Limit to 4 skills to keep context manageable
             ]
@@ -374,6 +633,7 @@ class CSVDataLoader:
 
 # Singleton instance
 _csv_loader: Optional[CSVDataLoader] = None
+_csv_loader_lock = threading.Lock()
 
 
 def get_csv_loader(csv_dir: str = None) -> CSVDataLoader:
@@ -381,7 +641,9 @@ def get_csv_loader(csv_dir: str = None) -> CSVDataLoader:
     global _csv_loader
     
     if _csv_loader is None:
-        _csv_loader = CSVDataLoader(csv_dir)
+        with _csv_loader_lock:
+            if _csv_loader is None:
+                _csv_loader = CSVDataLoader(csv_dir)
     
     return _csv_loader
 
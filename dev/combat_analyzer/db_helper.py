@@ -53,8 +53,17 @@ class CharacterInfo:
     race_tag: str = ""
     theme_tag: str = ""
     
+    # Rendered summary, built on first use (data is immutable after load)
+    _summary_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
     def get_summary(self) -> str:
         """Get a text summary for LLM context."""
+        if self._summary_cache is None:
+            self._summary_cache = self._build_summary()
+        return self._summary_cache
+    
+    def _build_summary(self) -> str:
+        """Render the text summary."""
         summary = f"{self.name}"
         if self.description:
             summary += f": {self.description}"
@@ -107,7 +116,8 @@ class DatabaseHelper:
             )
         
         self._connection = None
-        self._character_cache: Dict[str, CharacterInfo] = {}
+        # None marks a character that was looked up and not found
+        self._character_cache: Dict[str, Optional[CharacterInfo]] = {}
     
     def connect(self):
         """Establish database connection."""
@@ -128,6 +138,34 @@ class DatabaseHelper:
             normalized = normalized[:-2]
         return normalized
     
+    def _row_to_character_info(self, row: dict, normalized_id: str) -> CharacterInfo:
+        """Build a CharacterInfo from a joined characters/names/stats row."""
+        return CharacterInfo(
+            character_id=row.get('character', normalized_id),
+            name=row.get('name', '') or row.get('normal_name', '') or normalized_id,
+            description=row.get('description', '') or '',
+            status=row.get('status', '') or '',
+            collectable=row.get('collectable', False) or False,
+            boss=row.get('boss', False) or False,
+            region=row.get('region', '') or '',
+            rarity=row.get('rarity', '') or '',
+            archetype=row.get('archetype', '') or '',
+            family=row.get('family', '') or '',
+            race=row.get('race', '') or '',
+            theme=row.get('theme', '') or '',
+            original=row.get('original', False) or False,
+            battle_tier=row.get('battle_tier', '') or '',
+            attack=row.get('attack', 0) or 0,
+            defense=row.get('defense', 0) or 0,
+            health=row.get('health', 0) or 0,
+            speed=row.get('speed', 0) or 0,
+            pct_to_avg=float(row.get('pct_to_avg', 0) or 0),
+            archetype_tag=row.get('archetype_tag', '') or '',
+            family_tag=row.get('family_tag', '') or '',
+            race_tag=row.get('race_tag', '') or '',
+            theme_tag=row.get('theme_tag', '') or ''
+        )
+    
     def get_character(self, character_id: str) -> Optional[CharacterInfo]:
         """
         Fetch character info by ID or name.
@@ -139,7 +177,7 @@ class DatabaseHelper:
         """
         normalized_id = self._normalize_character_id(character_id)
         
-        # Check cache first
+        # Check cache first (misses are cached too)
         if normalized_id in self._character_cache:
             return self._character_cache[normalized_id]
         
@@ -179,49 +217,71 @@ class DatabaseHelper:
                 
                 row = cursor.fetchone()
             
-            if row:
-                char_info = CharacterInfo(
-                    character_id=row.get('character', normalized_id),
-                    name=row.get('name', '') or row.get('normal_name', '') or normalized_id,
-                    description=row.get('description', '') or '',
-                    status=row.get('status', '') or '',
-                    collectable=row.get('collectable', False) or False,
-                    boss=row.get('boss', False) or False,
-                    region=row.get('region', '') or '',
-                    rarity=row.get('rarity', '') or '',
-                    archetype=row.get('archetype', '') or '',
-                    family=row.get('family', '') or '',
-                    race=row.get('race', '') or '',
-                    theme=row.get('theme', '') or '',
-                    original=row.get('original', False) or False,
-                    battle_tier=row.get('battle_tier', '') or '',
-                    attack=row.get('attack', 0) or 0,
-                    defense=row.get('defense', 0) or 0,
-                    health=row.get('health', 0) or 0,
-                    speed=row.get('speed', 0) or 0,
-                    pct_to_avg=float(row.get('pct_to_avg', 0) or 0),
-                    archetype_tag=row.get('archetype_tag', '') or '',
-                    family_tag=row.get('family_tag', '') or '',
-                    race_tag=row.get('race_tag', '') or '',
-                    theme_tag=row.get('theme_tag', '') or ''
-                )
-                
-                # Cache the result
-                self._character_cache[normalized_id] = char_info
-                return char_info
+            char_info = self._row_to_character_info(row, normalized_id) if row else None
             
-            return None
+            # Cache the result, including a miss, so the fuzzy queries above
+            # run at most once per character
+            self._character_cache[normalized_id] = char_info
+            return char_info
             
+        except Exception:
+            # Leave the connection usable for the next lookup
+            conn.rollback()
+            raise
         finally:
             cursor.close()
     
     def get_characters_batch(self, character_ids: List[str]) -> Dict[str, CharacterInfo]:
-        """Fetch multiple characters at once."""
+        """
+        Fetch multiple characters at once.
+        
+        Exact ID/name matches for all uncached characters are fetched in a
+        single query; anything not found that way falls back to the fuzzy
+        per-character lookup in get_character(), whose misses are cached.
+        """
+        normalized_ids = list(dict.fromkeys(
+            self._normalize_character_id(char_id) for char_id in character_ids
+        ))
+        missing = [n for n in normalized_ids if n not in self._character_cache]
+        
+        if missing:
+            conn = self.connect()
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            
+            try:
+                cursor.execute("""
+                    SELECT c.*, 
+                           nd.name, nd.description,
+                           sa.attack, sa.defense, sa.health, sa.speed, sa.pct_to_avg
+                    FROM characters c
+                    LEFT JOIN names_descriptions nd ON c.character = nd.character_id
+                    LEFT JOIN stats_analysis sa ON nd.name = sa.character_name
+                    WHERE LOWER(c.character) IN %s
+                       OR LOWER(c.normal_name) IN %s
+                """, (tuple(missing), tuple(missing)))
+                
+                wanted = set(missing)
+                for row in cursor.fetchall():
+                    for key in (row.get('character'), row.get('normal_name')):
+                        key = (key or '').lower()
+                        if key in wanted and key not in self._character_cache:
+                            self._character_cache[key] = self._row_to_character_info(row, key)
+                
+            except Exception:
+                # The connection is not in autocommit mode, so a failed query
+                # aborts the transaction; roll back so later lookups can run
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        
+        # get_character answers cached hits and misses from memory and only
+        # queries names the bulk lookup did not find
         results = {}
-        for char_id in character_ids:
-            char_info = self.get_character(char_id)
+        for normalized_id in normalized_ids:
+            char_info = self.get_character(normalized_id)
             if char_info:
-                results[self._normalize_character_id(char_id)] = char_info
+                results[normalized_id] = char_info
         return results
     
     def get_character_context_for_battle(self, character_names: List[str]) -> str:
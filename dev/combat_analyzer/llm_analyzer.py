@@ -3,15 +3,27 @@ LLM Analyzer Module
 Builds prompts and calls OpenAI API to analyze battle results.
 """
 import os
+import sys
 import json
+import threading
+from collections import OrderedDict
 from dataclasses import asdict
-from typing import Optional, List
-from openai import OpenAI
+from functools import lru_cache
+from itertools import chain
+from typing import Optional, List, Callable
 from dotenv import load_dotenv
 
-from .metrics import BattleMetrics
+# orjson is much faster for the summary dicts; fall back to json if missing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from .metrics import BattleMetrics, CharacterMetrics, TeamMetrics
 from .db_helper import get_db_helper, get_battle_character_context, CharacterInfo
 from .csv_helper import get_csv_loader, get_character_csv_info, get_skill_csv_info
+from .response_cache import ResponseCache
 
 
 # Load environment variables
@@ -41,18 +53,72 @@ Focus on actionable insights like:
 - Buff/debuff management
 - Synergy opportunities based on character themes/families
 
-Keep your response concise but informative. Use simple language that any player can understand."""
+Keep your response concise but informative. Use simple language that any player can understand.
+After the suggestions, end your response with a line containing only "## End"."""
+
+
+def to_json(data, indent: bool = False) -> str:
+    """Serialize data to JSON text (compact, or indented for display)."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"))
+
+
+def from_json(text: str):
+    """Parse JSON text."""
+    return orjson.loads(text) if HAS_ORJSON else json.loads(text)
+
+
+# Character info as immutable JSON strings, least recently used first.
+# Only results backed by the database are kept, so a name looked up while
+# the database was unreachable is fetched again on the next call.
+CHARACTER_INFO_CACHE_SIZE = 2048
+_character_info_cache: OrderedDict = OrderedDict()
+_character_info_lock = threading.Lock()
 
 
 def get_character_db_info(character_name: str) -> dict:
-    """Fetch character info from database and CSV files."""
+    """
+    Fetch character info from database and CSV files.
+    
+    Database-backed results are memoized per character name; each call
+    returns a fresh copy so callers may modify it freely.
+    """
+    with _character_info_lock:
+        text = _character_info_cache.get(character_name)
+        if text is not None:
+            _character_info_cache.move_to_end(character_name)
+    
+    if text is None:
+        info, from_db = _fetch_character_db_info(character_name)
+        text = to_json(info)
+        if from_db:
+            with _character_info_lock:
+                _character_info_cache[character_name] = text
+                if len(_character_info_cache) > CHARACTER_INFO_CACHE_SIZE:
+                    _character_info_cache.popitem(last=False)
+    
+    return from_json(text)
+
+
+def _fetch_character_db_info(character_name: str) -> tuple:
+    """
+    Fetch character info from database and CSV files (uncached).
+    
+    Returns:
+        (info dict, whether the database had the character)
+    """
     result = {}
+    from_db = False
     
     # Try database first
     db = get_db_helper()
     if db:
         char_info = db.get_character(character_name)
         if char_info:
+            from_db = True
             result = {
                 "display_name": char_info.name,
                 "description": char_info.description,
@@ -93,88 +159,112 @@ def get_character_db_info(character_name: str) -> dict:
                 if not result.get(key) and csv_info.get(key):
                     result[key] = csv_info[key]
     
-    return result
+    return result, from_db
+
+
+def prefetch_character_info(character_names: List[str]) -> dict:
+    """
+    Fetch info for several characters, using one database round-trip.
+    
+    Returns:
+        Mapping of character name -> info dict (see get_character_db_info).
+    """
+    names = list(dict.fromkeys(character_names))
+    
+    # Warm the DB helper's cache with a single bulk query so the per-name
+    # lookups below are served from memory; names resolved by an earlier
+    # battle are already memoized and need no query
+    unresolved = [name for name in names if name not in _character_info_cache]
+    db = get_db_helper() if unresolved else None
+    if db:
+        try:
+            db.get_characters_batch(unresolved)
+        except Exception as e:
+            # The helper rolled the failed query back, so the per-name
+            # lookups below can still reach the database
+            print(f"Warning: Bulk character fetch failed: {e}")
+    
+    return {name: get_character_db_info(name) for name in names}
 
 
 def get_skill_info(skill_id: str) -> dict:
-    """Fetch skill info from CSV files."""
-    return get_skill_csv_info(skill_id)
+    """Fetch skill info from CSV files (memoized, returns a fresh copy)."""
+    return from_json(_get_skill_info_cached(skill_id))
 
 
-def build_battle_summary(metrics: BattleMetrics, include_db_info: bool = True) -> dict:
-    """Build a clean JSON summary for the LLM."""
-    
-    # Player team summary
-    player_team = {
-        "characters": [
-            {
-                "name": c.name,
-                "archetype": c.archetype,
-                "level": c.level,
-                "stats": {
-                    "health": c.starting_health,
-                    "attack": c.starting_attack,
-                    "defense": c.starting_defense,
-                    "speed": c.starting_speed
-                },
-                "performance": {
-                    "damage_dealt": c.total_damage_dealt,
-                    "damage_taken": c.total_damage_taken,
-                    "turns_taken": c.turns_taken,
-                    "was_ko": c.was_ko,
-                    "ko_turn": c.ko_turn,
-                    "final_health_percent": round(c.final_health_percent, 1)
-                },
-                "db_info": get_character_db_info(c.name) if include_db_info else {}
-            }
-            for c in metrics.player_characters
-        ],
-        "totals": {
-            "avg_attack": round(metrics.player_team.avg_attack, 1),
-            "avg_defense": round(metrics.player_team.avg_defense, 1),
-            "avg_speed": round(metrics.player_team.avg_speed, 1),
-            "avg_health": round(metrics.player_team.avg_health, 1),
-            "total_damage": metrics.player_team.total_damage_dealt,
-            "characters_alive": metrics.player_team.characters_alive,
-            "had_first_turn": metrics.player_team.first_turn
-        }
+@lru_cache(maxsize=2048)
+def _get_skill_info_cached(skill_id: str) -> str:
+    """Look up skill info once and keep it as an immutable JSON string."""
+    return to_json(get_skill_csv_info(skill_id))
+
+
+def clear_caches():
+    """Clear memoized character and skill lookups (e.g. after data changes)."""
+    with _character_info_lock:
+        _character_info_cache.clear()
+    _get_skill_info_cached.cache_clear()
+
+
+def _character_summary(c: CharacterMetrics, db_info: dict) -> dict:
+    """Summarize one character's stats and performance for the LLM."""
+    return {
+        "name": c.name,
+        "archetype": c.archetype,
+        "level": c.level,
+        "stats": {
+            "health": c.starting_health,
+            "attack": c.starting_attack,
+            "defense": c.starting_defense,
+            "speed": c.starting_speed
+        },
+        "performance": {
+            "damage_dealt": c.total_damage_dealt,
+            "damage_taken": c.total_damage_taken,
+            "turns_taken": c.turns_taken,
+            "was_ko": c.was_ko,
+            "ko_turn": c.ko_turn,
+            "final_health_percent": c.final_health_percent_r
+        },
+        "db_info": db_info.get(c.name, {})
     }
-    
-    # Enemy team summary
-    enemy_team = {
-        "characters": [
-            {
-                "name": c.name,
-                "archetype": c.archetype,
-                "level": c.level,
-                "stats": {
-                    "health": c.starting_health,
-                    "attack": c.starting_attack,
-                    "defense": c.starting_defense,
-                    "speed": c.starting_speed
-                },
-                "performance": {
-                    "damage_dealt": c.total_damage_dealt,
-                    "damage_taken": c.total_damage_taken,
-                    "turns_taken": c.turns_taken,
-                    "was_ko": c.was_ko,
-                    "ko_turn": c.ko_turn,
-                    "final_health_percent": round(c.final_health_percent, 1)
-                },
-                "db_info": get_character_db_info(c.name) if include_db_info else {}
-            }
-            for c in metrics.enemy_characters
-        ],
+
+
+def _team_summary(characters: list, team: TeamMetrics, db_info: dict) -> dict:
+    """Summarize a team's characters and totals for the LLM."""
+    return {
+        "characters": [_character_summary(c, db_info) for c in characters],
         "totals": {
-            "avg_attack": round(metrics.enemy_team.avg_attack, 1),
-            "avg_defense": round(metrics.enemy_team.avg_defense, 1),
-            "avg_speed": round(metrics.enemy_team.avg_speed, 1),
-            "avg_health": round(metrics.enemy_team.avg_health, 1),
-            "total_damage": metrics.enemy_team.total_damage_dealt,
-            "characters_alive": metrics.enemy_team.characters_alive,
-            "had_first_turn": metrics.enemy_team.first_turn
+            "avg_attack": team.avg_attack_r,
+            "avg_defense": team.avg_defense_r,
+            "avg_speed": team.avg_speed_r,
+            "avg_health": team.avg_health_r,
+            "total_damage": team.total_damage_dealt,
+            "characters_alive": team.characters_alive,
+            "had_first_turn": team.first_turn
         }
     }
+
+
+def _prefetch_summary_db_info(metrics: BattleMetrics) -> dict:
+    """
+    Look up character info up front in one batch.
+    
+    Characters that never acted, dealt damage or were KO'd get no db_info,
+    saving lookups and prompt tokens.
+    """
+    return prefetch_character_info([
+        c.name for c in chain(metrics.player_characters, metrics.enemy_characters)
+        if c.turns_taken or c.total_damage_dealt or c.was_ko
+    ])
+
+
+def build_battle_summary(metrics: BattleMetrics, include_db_info: bool = True) -> dict:
+    """Build a clean JSON summary for the LLM."""
+    
+    db_info = _prefetch_summary_db_info(metrics) if include_db_info else {}
+    
+    player_team = _team_summary(metrics.player_characters, metrics.player_team, db_info)
+    enemy_team = _team_summary(metrics.enemy_characters, metrics.enemy_team, db_info)
     
     # Build summary
     summary = {
@@ -200,14 +290,49 @@ def build_battle_summary(metrics: BattleMetrics, include_db_info: bool = True) -
     return summary
 
 
-def build_user_prompt(summary: dict) -> str:
+# db_info fields that add tokens without helping the analysis
+PROMPT_DROPPED_DB_INFO_KEYS = frozenset({"description", "region", "race"})
+
+
+def compact_summary(summary: dict, include_turn_order: bool = False) -> dict:
+    """
+    Strip a battle summary down to what the LLM needs.
+    
+    Drops missing values (None, "", {}, []) but keeps zeros and False, which
+    carry meaning (no characters alive, 0% health left); removes verbose
+    db_info fields, and omits the turn order unless requested.
+    """
+    def prune(value, key=None):
+        if isinstance(value, dict):
+            pruned = {}
+            for k, v in value.items():
+                if key == "db_info" and k in PROMPT_DROPPED_DB_INFO_KEYS:
+                    continue
+                if k == "turn_order" and not include_turn_order:
+                    continue
+                v = prune(v, k)
+                if v is None or v == "" or v == {} or v == []:
+                    continue
+                pruned[k] = v
+            return pruned
+        if isinstance(value, list):
+            return [prune(v, key) for v in value]
+        return value
+    
+    return prune(summary)
+
+
+def build_user_prompt(summary: dict, verbose: bool = False) -> str:
     """Build the user prompt with battle data."""
     result_text = "WON" if summary["result"] == "WIN" else "LOST"
     
+    # Compact JSON: fewer input tokens means lower cost and latency
+    battle_json = to_json(compact_summary(summary, include_turn_order=verbose))
+    
     prompt = f"""Analyze this battle where the player {result_text}.
 
 ## Battle Summary
-{json.dumps(summary, indent=2)}
+{battle_json}
 
 Please provide:
 1. **Battle Summary**: What happened in this battle? (2-3 sentences)
@@ -219,47 +344,231 @@ Focus on specific characters, stats, and events from this battle."""
     return prompt
 
 
+# Low temperature keeps answers consistent (and cacheable); the token cap
+# sits above typical response length for the three requested sections, and
+# the stop sequence cuts generation at the end marker the system prompt asks for
+DEFAULT_TEMPERATURE = 0.3
+DEFAULT_MAX_TOKENS = 600
+STOP_SEQUENCES = ["\n## End"]
+
+
+# Retries are left to the OpenAI SDK, which backs off exponentially on
+# connection errors, timeouts, 408/409/429 and 5xx responses
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 60.0  # seconds per request attempt
+
+
+# OpenAI clients shared by all analyzers, keyed by API key, so repeated
+# analyses reuse the same HTTP connection pool
+_openai_clients: dict = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _get_client(api_key: str):
+    """Get or create the shared OpenAI client for an API key."""
+    client = _openai_clients.get(api_key)
+    
+    if client is None:
+        with _openai_clients_lock:
+            client = _openai_clients.get(api_key)
+            if client is None:
+                # Imported here so loading this module does not pull in openai
+                from openai import OpenAI
+                client = _openai_clients[api_key] = OpenAI(
+                    api_key=api_key, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT
+                )
+    
+    return client
+
+
+def _write_stdout(text: str):
+    """Write streamed text to the console immediately."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
 class BattleAnalyzer:
     """Analyzes battles using OpenAI API."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
-        """Initialize the analyzer with OpenAI API key."""
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini",
+                 use_cache: bool = True, refresh_cache: bool = False,
+                 cache: Optional[ResponseCache] = None, verbose: bool = False,
+                 temperature: float = DEFAULT_TEMPERATURE, max_tokens: int = DEFAULT_MAX_TOKENS):
+        """
+        Initialize the analyzer with OpenAI API key.
+        
+        Args:
+            api_key: OpenAI API key. Defaults to OPENAI_API env var.
+            model: Chat model to use.
+            use_cache: Reuse stored responses for identical requests.
+            refresh_cache: Ignore stored responses but still store new ones.
+            cache: Response cache to use. Defaults to the on-disk cache.
+            verbose: Include the full turn order in the prompt.
+            temperature: Sampling temperature (lower is more deterministic).
+            max_tokens: Cap on response length.
+        """
         self.api_key = api_key or os.getenv("OPENAI_API")
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API in .env file.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
         self.model = model
+        
+        self.cache = (cache or ResponseCache()) if use_cache else None
+        self.refresh_cache = refresh_cache
+        self.verbose = verbose
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        
+        # Created on first async call and shared by all concurrent requests
+        self._async_client = None
     
-    def analyze(self, metrics: BattleMetrics) -> str:
-        """Analyze battle metrics and return explanation."""
-        # Build the summary
-        summary = build_battle_summary(metrics)
+    def build_request_body(self, summary: dict) -> dict:
+        """Build the chat completion request body for a battle summary."""
+        return self._request_body(build_user_prompt(summary, verbose=self.verbose))
+    
+    def build_metrics_request_body(self, metrics: BattleMetrics) -> dict:
+        """Build the chat completion request body for battle metrics."""
+        return self.build_request_body(build_battle_summary(metrics))
+    
+    def _request_body(self, user_prompt: str) -> dict:
+        """Chat completion request body for a user prompt."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stop": STOP_SEQUENCES
+        }
+    
+    def _get_cached(self, body: dict) -> tuple:
+        """
+        Look up a stored response for a request body.
+        
+        Returns:
+            (cache key or None when caching is off, cached content or None)
+        """
+        if self.cache is None:
+            return None, None
+        
+        key = ResponseCache.make_key(body)
+        if self.refresh_cache:
+            return key, None
+        return key, self.cache.get(key)
+    
+    def _store_cached(self, key: Optional[str], content: Optional[str]):
+        """Store a successful response under its cache key."""
+        if key and content:
+            self.cache.set(key, content)
+    
+    def analyze(self, metrics: BattleMetrics, stream: bool = False,
+                on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Analyze battle metrics and return explanation.
+        
+        Args:
+            metrics: Computed battle metrics.
+            stream: Stream the response, passing each text piece to on_delta
+                as it arrives (cached responses and errors are passed whole).
+            on_delta: Callback for streamed text. Defaults to writing stdout.
+        """
+        return self._analyze_body(self.build_metrics_request_body(metrics), stream, on_delta)
+    
+    def analyze_summary(self, summary: dict, stream: bool = False,
+                        on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Analyze an already built battle summary.
         
-        # Build prompts
-        user_prompt = build_user_prompt(summary)
+        Use this instead of analyze() when the summary is needed elsewhere
+        too, so it is only built once. Arguments match analyze().
+        """
+        return self._analyze_body(self.build_request_body(summary), stream, on_delta)
+    
+    def _analyze_body(self, body: dict, stream: bool = False,
+                      on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Answer a request body from the cache or the API."""
+        emit = (on_delta or _write_stdout) if stream else None
+        
+        key, cached = self._get_cached(body)
+        if cached is not None:
+            if emit:
+                emit(cached)
+            return cached
         
         # Call OpenAI API
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
+            if emit:
+                content = self._stream_completion(body, emit)
+            else:
+                response = self._call_openai(body)
+                content = response.choices[0].message.content
+        
+        except Exception as e:
+            error = f"Error analyzing battle: {str(e)}"
+            if emit:
+                emit(error)
+            return error
+        
+        self._store_cached(key, content)
+        return content
+    
+    def _call_openai(self, body: dict, **kwargs):
+        """Create a chat completion (the client retries transient errors)."""
+        return self.client.chat.completions.create(**body, **kwargs)
+    
+    async def _acall_openai(self, body: dict):
+        """Async version of _call_openai()."""
+        return await self._async_client.chat.completions.create(**body)
+    
+    def _stream_completion(self, body: dict, emit: Callable[[str], None]) -> str:
+        """Run a streaming completion, emitting deltas and returning the full text."""
+        parts = []
+        for chunk in self._call_openai(body, stream=True):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                emit(delta)
+        return "".join(parts)
+    
+    async def aanalyze(self, metrics: BattleMetrics) -> str:
+        """Async version of analyze() so several analyses can overlap network time."""
+        body = self.build_metrics_request_body(metrics)
+        
+        key, cached = self._get_cached(body)
+        if cached is not None:
+            return cached
+        
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT
             )
-            
-            return response.choices[0].message.content
+        
+        try:
+            response = await self._acall_openai(body)
+            content = response.choices[0].message.content
         
         except Exception as e:
             return f"Error analyzing battle: {str(e)}"
+        
+        self._store_cached(key, content)
+        return content
+    
+    async def aclose(self):
+        """Close the async client (it is bound to the running event loop)."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
     
     def analyze_with_details(self, metrics: BattleMetrics) -> dict:
         """Analyze and return both the analysis and the raw data."""
         summary = build_battle_summary(metrics)
-        analysis = self.analyze(metrics)
+        analysis = self.analyze_summary(summary)
         
         return {
             "analysis": analysis,
@@ -5,34 +5,41 @@ Analyzes battle logs and explains why battles were won/lost.
 """
 import os
 import sys
-import json
+import asyncio
 import argparse
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 from .battle_parser import parse_battle_log
 from .metrics import compute_battle_metrics
-from .llm_analyzer import BattleAnalyzer, build_battle_summary
+
+# llm_analyzer and batch_runner (openai, DB/CSV helpers) are imported inside
+# the functions that call the LLM, so --list and --help start quickly
 
 
 def find_battle_logs(source_dir: str) -> list:
     """Find all battle log files in source directory."""
     logs = []
-    source_path = Path(source_dir)
     
-    if not source_path.exists():
+    if not os.path.isdir(source_dir):
         print(f"Error: Source directory not found: {source_dir}")
         return logs
     
+    # os.scandir entries carry their type from the directory listing, so no
+    # per-file stat calls or Path objects are needed
     # Search for client_battle_log_*.txt files
-    for data_dir in source_path.iterdir():
-        if data_dir.is_dir() and data_dir.name.startswith("data"):
-            for file in data_dir.iterdir():
-                if file.name.startswith("client_battle_log_") and file.suffix == ".txt":
-                    logs.append({
-                        "path": str(file),
-                        "name": data_dir.name,
-                        "battle_id": file.stem.replace("client_battle_log_", "")
-                    })
+    prefix = "client_battle_log_"
+    with os.scandir(source_dir) as entries:
+        for data_dir in entries:
+            if data_dir.name.startswith("data") and data_dir.is_dir():
+                with os.scandir(data_dir.path) as files:
+                    for file in files:
+                        name = file.name
+                        if name.startswith(prefix) and name.endswith(".txt"):
+                            logs.append({
+                                "path": file.path,
+                                "name": data_dir.name,
+                                "battle_id": name[len(prefix):-len(".txt")]
+                            })
     
     return logs
 
@@ -79,8 +86,17 @@ def print_metrics_summary(metrics):
         print(f"💥 Biggest Hit: {metrics.biggest_hit['damage']} damage by {metrics.biggest_hit['attacker']}")
 
 
-def analyze_single_battle(log_path: str, show_metrics: bool = True, show_json: bool = False):
-    """Analyze a single battle log."""
+def analyze_single_battle(log_path: str, show_metrics: bool = True, show_json: bool = False,
+                          analyzer=None, **analyzer_options):
+    """
+    Analyze a single battle log.
+    
+    Pass an existing BattleAnalyzer to reuse it across battles; otherwise
+    one is created from the extra keyword arguments (use_cache,
+    refresh_cache, verbose, ...).
+    """
+    from .llm_analyzer import BattleAnalyzer, build_battle_summary, compact_summary, to_json
+    
     print(f"📁 Analyzing: {log_path}")
     print_separator()
     
@@ -97,21 +113,31 @@ def analyze_single_battle(log_path: str, show_metrics: bool = True, show_json: b
             print_metrics_summary(metrics)
             print_separator()
         
+        # With --json the summary is built here, printed and reused for the
+        # LLM request; otherwise analyze() builds it from the metrics
+        summary = None
         if show_json:
             summary = build_battle_summary(metrics)
             print("📋 JSON SUMMARY")
             print("-" * 40)
-            print(json.dumps(summary, indent=2))
+            print(to_json(
+                compact_summary(summary, include_turn_order=analyzer_options.get("verbose", False)),
+                indent=True
+            ))
             print_separator()
         
         # Analyze with LLM
         print("🤖 Generating AI Analysis...")
         print("-" * 40)
         
-        analyzer = BattleAnalyzer()
-        analysis = analyzer.analyze(metrics)
+        # Stream so the first tokens show up as soon as they are generated
+        analyzer = analyzer or BattleAnalyzer(**analyzer_options)
+        if summary is not None:
+            analyzer.analyze_summary(summary, stream=True)
+        else:
+            analyzer.analyze(metrics, stream=True)
         
-        print(analysis)
+        print()
         print_separator()
         
         return True
@@ -126,6 +152,146 @@ def analyze_single_battle(log_path: str, show_metrics: bool = True, show_json: b
         return False
 
 
+# Worker processes cost ~100ms to start under spawn (5-20ms under fork)
+# against ~2ms to parse one log, so a pool only pays off for large batches
+PARALLEL_MIN_LOGS = 64
+
+
+def _prepare(log_path: str) -> tuple:
+    """
+    Parse a battle log and compute its metrics (may run in a worker process).
+    
+    Returns:
+        (log_path, metrics or None, error message or None)
+    """
+    try:
+        return log_path, compute_battle_metrics(parse_battle_log(log_path)), None
+    except Exception as e:
+        return log_path, None, str(e)
+
+
+def prepare_metrics(log_paths: list) -> dict:
+    """
+    Parse logs and compute metrics for several battles.
+    
+    Parsing is CPU-bound and independent per log, so batches of at least
+    PARALLEL_MIN_LOGS logs are spread over worker processes; smaller ones
+    run serially. Logs that fail are reported and skipped.
+    
+    Returns:
+        Mapping of log path -> BattleMetrics.
+    """
+    workers = min(os.cpu_count() or 1, len(log_paths))
+    if len(log_paths) >= PARALLEL_MIN_LOGS and workers > 1:
+        # About four chunks per worker keeps the load balanced without
+        # paying inter-process overhead for every log
+        chunksize = max(1, len(log_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_prepare, log_paths, chunksize=chunksize))
+    else:
+        results = [_prepare(log_path) for log_path in log_paths]
+    
+    metrics_by_path = {}
+    for log_path, metrics, error in results:
+        if error is not None:
+            print(f"❌ Skipping {log_path}: {error}")
+        else:
+            metrics_by_path[log_path] = metrics
+    
+    return metrics_by_path
+
+
+def analyze_many(log_paths: list, concurrency: int = 8, **analyzer_options) -> dict:
+    """
+    Analyze several battle logs with overlapping OpenAI requests.
+    
+    Logs are parsed up front in parallel, then at most `concurrency`
+    requests are in flight at once over one shared async client. Extra
+    keyword arguments are passed to BattleAnalyzer.
+    
+    Returns:
+        Mapping of log path -> analysis text (or an error message); empty
+        if the analyzer cannot be created (e.g. no API key).
+    """
+    from .llm_analyzer import BattleAnalyzer
+    
+    try:
+        analyzer = BattleAnalyzer(**analyzer_options)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return {}
+    
+    metrics_by_path = prepare_metrics(log_paths)
+    
+    async def run() -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(metrics):
+            async with semaphore:
+                return await analyzer.aanalyze(metrics)
+        
+        try:
+            return await asyncio.gather(*(bounded(m) for m in metrics_by_path.values()))
+        finally:
+            await analyzer.aclose()
+    
+    return dict(zip(metrics_by_path, asyncio.run(run())))
+
+
+def analyze_all_battles_concurrently(source_dir: str, concurrency: int = 8, **analyzer_options):
+    """Analyze every available battle log with concurrent OpenAI requests."""
+    logs = find_battle_logs(source_dir)
+    
+    if not logs:
+        print(f"No battle logs found in {source_dir}")
+        return
+    
+    print(f"🤖 Analyzing {len(logs)} battles ({concurrency} at a time)...")
+    print_separator()
+    
+    results = analyze_many([log["path"] for log in logs], concurrency=concurrency, **analyzer_options)
+    
+    for log in logs:
+        if log["path"] not in results:
+            continue
+        print(f"📁 [{log['name']}] {log['battle_id']}")
+        print("-" * 40)
+        print(results[log["path"]])
+        print_separator()
+
+
+def analyze_all_battles_batch(source_dir: str, **analyzer_options):
+    """Analyze every available battle log in one OpenAI Batch API submission."""
+    from .llm_analyzer import BattleAnalyzer
+    from .batch_runner import analyze_batch
+    
+    logs = find_battle_logs(source_dir)
+    
+    if not logs:
+        print(f"No battle logs found in {source_dir}")
+        return
+    
+    try:
+        analyzer = BattleAnalyzer(**analyzer_options)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return
+    
+    print(f"🤖 Submitting {len(logs)} battles for batch analysis...")
+    print_separator()
+    
+    log_paths = [log["path"] for log in logs]
+    results = analyze_batch(log_paths, analyzer, metrics_by_path=prepare_metrics(log_paths))
+    
+    for log in logs:
+        if log["path"] not in results:
+            continue
+        print(f"📁 [{log['name']}] {log['battle_id']}")
+        print("-" * 40)
+        print(results[log["path"]])
+        print_separator()
+
+
 def list_available_battles(source_dir: str):
     """List all available battle logs."""
     logs = find_battle_logs(source_dir)
@@ -142,14 +308,23 @@ def list_available_battles(source_dir: str):
     print(f"Or use --file <path> to analyze a specific file")
 
 
-def interactive_mode(source_dir: str):
+def interactive_mode(source_dir: str, **analyzer_options):
     """Run in interactive mode."""
+    from .llm_analyzer import BattleAnalyzer
+    
     logs = find_battle_logs(source_dir)
     
     if not logs:
         print(f"No battle logs found in {source_dir}")
         return
     
+    # One analyzer for the whole session
+    try:
+        analyzer = BattleAnalyzer(**analyzer_options)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return
+    
     while True:
         print("\n" + "=" * 60)
         print("🎮 AI COMBAT REPLAY SUMMARIZER")
@@ -170,7 +345,7 @@ def interactive_mode(source_dir: str):
                 break
             
             if 1 <= choice <= len(logs):
-                analyze_single_battle(logs[choice - 1]["path"])
+                analyze_single_battle(logs[choice - 1]["path"], analyzer=analyzer)
             else:
                 print("Invalid choice. Please try again.")
                 
@@ -235,23 +410,93 @@ def main():
         help="Hide detailed metrics"
     )
     
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Analyze all battles in one OpenAI Batch API submission (slower turnaround, lower cost)"
+    )
+    
+    parser.add_argument(
+        "--all", "-a",
+        action="store_true",
+        help="Analyze all battles now, running OpenAI requests concurrently"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent OpenAI requests for --all (default: 8)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk LLM response cache"
+    )
+    
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached LLM responses and store fresh ones"
+    )
+    
+    parser.add_argument(
+        "--model",
+        default="gpt-4o-mini",
+        help="OpenAI model used for the analysis (default: gpt-4o-mini)"
+    )
+    
+    parser.add_argument(
+        "--temp",
+        type=float,
+        help="LLM sampling temperature (default: 0.3)"
+    )
+    
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        help="Maximum tokens in the LLM response (default: 600)"
+    )
+    
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Include the full turn order in the LLM prompt"
+    )
+    
     args = parser.parse_args()
     
     # Handle --no-metrics flag
     show_metrics = not args.no_metrics
+    analyzer_options = {
+        "use_cache": not args.no_cache,
+        "refresh_cache": args.refresh_cache,
+        "verbose": args.verbose,
+        "model": args.model
+    }
+    # Left unset, BattleAnalyzer applies its own defaults
+    if args.temp is not None:
+        analyzer_options["temperature"] = args.temp
+    if args.max_tokens is not None:
+        analyzer_options["max_tokens"] = args.max_tokens
     
     if args.list:
         list_available_battles(args.source)
+    elif args.batch:
+        analyze_all_battles_batch(args.source, **analyzer_options)
+    elif args.all:
+        analyze_all_battles_concurrently(args.source, concurrency=args.concurrency, **analyzer_options)
     elif args.file:
-        analyze_single_battle(args.file, show_metrics=show_metrics, show_json=args.json)
+        analyze_single_battle(args.file, show_metrics=show_metrics, show_json=args.json, **analyzer_options)
     elif args.battle:
         logs = find_battle_logs(args.source)
         if 1 <= args.battle <= len(logs):
-            analyze_single_battle(logs[args.battle - 1]["path"], show_metrics=show_metrics, show_json=args.json)
+            analyze_single_battle(logs[args.battle - 1]["path"], show_metrics=show_metrics, show_json=args.json, **analyzer_options)
         else:
             print(f"Invalid battle number. Use --list to see available battles (1-{len(logs)})")
     elif args.interactive:
-        interactive_mode(args.source)
+        interactive_mode(args.source, **analyzer_options)
     else:
         # Default: analyze first available battle or show help
         logs = find_battle_logs(args.source)
@@ -259,7 +504,7 @@ def main():
             print("🎮 AI COMBAT REPLAY SUMMARIZER")
             print("=" * 60)
             print(f"\nFound {len(logs)} battles. Analyzing the first one...\n")
-            analyze_single_battle(logs[0]["path"], show_metrics=show_metrics, show_json=args.json)
+            analyze_single_battle(logs[0]["path"], show_metrics=show_metrics, show_json=args.json, **analyzer_options)
         else:
             parser.print_help()
 
@@ -3,11 +3,45 @@ Metrics Computation Module
 Computes battle metrics from parsed battle data.
 """
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from .battle_parser import ParsedBattle, CharacterStats
 
 
-@dataclass
+# Side suffixes on character names in battle events (bugs_bunny_l)
+_SIDE_SUFFIXES = ('_l', '_r')
+
+
+@lru_cache(maxsize=None)
+def _strip(name: str) -> str:
+    """Remove the team side suffix (_l / _r) from a character name."""
+    return name[:-2] if name.endswith(_SIDE_SUFFIXES) else name
+
+
+@lru_cache(maxsize=4096)
+def _advantage(player_total: int, player_count: int, enemy_total: int, enemy_count: int) -> str:
+    """
+    Which side's average stat leads by more than 10% ("player", "enemy" or "even").
+    
+    Works on the integer stat totals: scaling both averages by the product
+    of the team sizes (player_total * enemy_count vs enemy_total *
+    player_count) keeps the comparison exact, so ties at exactly 10% are
+    never tipped by float rounding. An empty team averages 0.
+    """
+    player_val = player_total * (enemy_count or 1)
+    enemy_val = enemy_total * (player_count or 1)
+    larger = player_val if player_val > enemy_val else enemy_val
+    if larger == 0:
+        return "even"
+    
+    # |diff| / larger > 10%, without the division
+    diff = player_val - enemy_val
+    if 10 * abs(diff) <= larger:
+        return "even"
+    return "player" if diff > 0 else "enemy"
+
+
+@dataclass(slots=True)
 class CharacterMetrics:
     """Computed metrics for a single character."""
     name: str
@@ -45,9 +79,10 @@ class CharacterMetrics:
     # Final state
     final_health: int = 0
     final_health_percent: float = 0.0
+    final_health_percent_r: float = 0.0  # Rounded to 1 decimal for summaries
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamMetrics:
     """Aggregated metrics for a team."""
     team_name: str  # LEFT or RIGHT
@@ -63,6 +98,18 @@ class TeamMetrics:
     avg_speed: float = 0.0
     avg_health: float = 0.0
     
+    # Averages rounded to 1 decimal for summaries
+    avg_attack_r: float = 0.0
+    avg_defense_r: float = 0.0
+    avg_speed_r: float = 0.0
+    avg_health_r: float = 0.0
+    
+    # Stat totals the averages are taken from (exact, for comparisons)
+    total_attack: int = 0
+    total_defense: int = 0
+    total_speed: int = 0
+    total_health: int = 0
+    
     # Team composition
     character_count: int = 0
     archetypes: list = field(default_factory=list)
@@ -80,7 +127,7 @@ class TeamMetrics:
     total_debuffs_received: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class BattleMetrics:
     """Complete battle metrics."""
     # Result
@@ -117,69 +164,127 @@ class MetricsComputer:
     
     def compute(self, battle: ParsedBattle) -> BattleMetrics:
         """Compute all metrics from parsed battle."""
-        # Initialize character metrics
-        player_chars = self._init_character_metrics(battle.left_team)
-        enemy_chars = self._init_character_metrics(battle.right_team)
+        # Results live in plain lists indexed by character position and are
+        # combined with the parsed starting stats into CharacterMetrics once
+        # all events are tallied
+        chars = battle.left_team + battle.right_team
+        n = len(chars)
+        
+        # Events name characters with a side suffix (bugs_bunny_l); _strip
+        # is memoized, so resolving a name is two dict lookups
+        index = {c.name: i for i, c in enumerate(chars)}.get
         
-        all_chars = {c.name: c for c in player_chars + enemy_chars}
+        damage_dealt = [0] * n
+        damage_taken = [0] * n
+        healing_received = [0] * n
+        turns_taken = [0] * n
+        buffs_received = [0] * n
+        debuffs_received = [0] * n
+        buffs_applied = [0] * n
+        debuffs_applied = [0] * n
+        first_turn_number = [None] * n
+        was_ko = [False] * n
+        ko_turn = [None] * n
+        final_health = [0] * n
+        final_health_percent = [0.0] * n
         
-        # Process damage events
+        # Process damage events, tracking the biggest hit in the same pass
+        best_hit = None
+        best_amount = 0
         for event in battle.damage_events:
-            attacker = event.attacker.replace('_l', '').replace('_r', '')
-            target = event.target.replace('_l', '').replace('_r', '')
+            amount = event.damage
+            attacker = index(_strip(event.attacker))
+            target = index(_strip(event.target))
             
-            if attacker in all_chars:
-                all_chars[attacker].total_damage_dealt += event.damage
-            if target in all_chars:
-                all_chars[target].total_damage_taken += event.damage
+            if attacker is not None:
+                damage_dealt[attacker] += amount
+            if target is not None:
+                damage_taken[target] += amount
+            
+            if best_hit is None or amount > best_amount:
+                best_hit = event
+                best_amount = amount
         
         # Process heal events
         for event in battle.heal_events:
-            target = event.target.replace('_l', '').replace('_r', '')
-            if target in all_chars:
-                all_chars[target].total_healing_received += event.amount
+            i = index(_strip(event.target))
+            if i is not None:
+                healing_received[i] += event.amount
         
-        # Process KO events
+        # Process KO events, noting the first KO as it goes by
+        first_ko = None
         for event in battle.ko_events:
-            char_name = event.character.replace('_l', '').replace('_r', '')
-            if char_name in all_chars:
-                all_chars[char_name].was_ko = True
-                all_chars[char_name].ko_turn = event.turn
+            if first_ko is None:
+                team = "LEFT" if event.character.endswith("_l") else "RIGHT"
+                first_ko = {"character": _strip(event.character), "turn": event.turn, "team": team}
+            
+            i = index(_strip(event.character))
+            if i is not None:
+                was_ko[i] = True
+                ko_turn[i] = event.turn
         
         # Process turns
         turn_order = []
         for turn in battle.turns:
-            owner = turn.owner.replace('_l', '').replace('_r', '')
-            if owner in all_chars:
-                all_chars[owner].turns_taken += 1
-                if all_chars[owner].first_turn_number is None:
-                    all_chars[owner].first_turn_number = turn.turn_number
-                    turn_order.append({"character": owner, "turn": turn.turn_number, "team": all_chars[owner].team})
+            i = index(_strip(turn.owner))
+            if i is not None:
+                turns_taken[i] += 1
+                if first_turn_number[i] is None:
+                    first_turn_number[i] = turn.turn_number
+                    if len(turn_order) < 5:  # Only the first 5 are kept
+                        turn_order.append({"character": chars[i].name, "turn": turn.turn_number, "team": chars[i].team})
         
         # Process buff/debuff events
         for event in battle.buff_debuff_events:
-            target = event.target.replace('_l', '').replace('_r', '')
-            source = event.source.replace('_l', '').replace('_r', '') if event.source else ""
+            target = index(_strip(event.target))
+            source = index(_strip(event.source)) if event.source else None
+            if event.is_buff:
+                received, applied = buffs_received, buffs_applied
+            else:
+                received, applied = debuffs_received, debuffs_applied
             
-            if target in all_chars:
-                if event.is_buff:
-                    all_chars[target].buffs_received += 1
-                else:
-                    all_chars[target].debuffs_received += 1
-            
-            if source and source in all_chars:
-                if event.is_buff:
-                    all_chars[source].buffs_applied += 1
-                else:
-                    all_chars[source].debuffs_applied += 1
+            if target is not None:
+                received[target] += 1
+            if source is not None:
+                applied[source] += 1
         
         # Set final health from result
-        for char_name, health_info in battle.result.final_health.items():
-            clean_name = char_name.replace('_l', '').replace('_r', '')
-            if clean_name in all_chars:
-                all_chars[clean_name].final_health = health_info["current"]
+        for name, health_info in battle.result.final_health.items():
+            i = index(_strip(name))
+            if i is not None:
+                final_health[i] = health_info["current"]
                 max_hp = health_info["max"]
-                all_chars[clean_name].final_health_percent = (health_info["current"] / max_hp * 100) if max_hp > 0 else 0
+                final_health_percent[i] = (health_info["current"] / max_hp * 100) if max_hp > 0 else 0
+        
+        finals = [
+            CharacterMetrics(
+                name=c.name,
+                team=c.team,
+                archetype=c.archetype,
+                level=c.level,
+                total_damage_dealt=damage_dealt[i],
+                total_damage_taken=damage_taken[i],
+                total_healing_received=healing_received[i],
+                turns_taken=turns_taken[i],
+                first_turn_number=first_turn_number[i],
+                was_ko=was_ko[i],
+                ko_turn=ko_turn[i],
+                buffs_received=buffs_received[i],
+                debuffs_received=debuffs_received[i],
+                buffs_applied=buffs_applied[i],
+                debuffs_applied=debuffs_applied[i],
+                starting_health=c.max_health,
+                starting_attack=c.attack,
+                starting_defense=c.defense,
+                starting_speed=c.speed,
+                final_health=final_health[i],
+                final_health_percent=final_health_percent[i],
+                final_health_percent_r=round(final_health_percent[i], 1)
+            )
+            for i, c in enumerate(chars)
+        ]
+        player_chars = finals[:len(battle.left_team)]
+        enemy_chars = finals[len(battle.left_team):]
         
         # Compute team metrics
         player_team = self._compute_team_metrics("LEFT", player_chars)
@@ -192,29 +297,23 @@ class MetricsComputer:
             enemy_team.first_turn = first_turn_team == "RIGHT"
         
         # Find key events
-        first_ko = None
-        if battle.ko_events:
-            ko = battle.ko_events[0]
-            char_name = ko.character.replace('_l', '').replace('_r', '')
-            team = "LEFT" if "_l" in ko.character else "RIGHT"
-            first_ko = {"character": char_name, "turn": ko.turn, "team": team}
-        
         biggest_hit = None
-        if battle.damage_events:
-            max_dmg = max(battle.damage_events, key=lambda x: x.damage)
+        if best_hit is not None:
             biggest_hit = {
-                "attacker": max_dmg.attacker.replace('_l', '').replace('_r', ''),
-                "target": max_dmg.target.replace('_l', '').replace('_r', ''),
-                "damage": max_dmg.damage,
-                "turn": max_dmg.turn,
-                "skill": max_dmg.skill_id
+                "attacker": _strip(best_hit.attacker),
+                "target": _strip(best_hit.target),
+                "damage": best_hit.damage,
+                "turn": best_hit.turn,
+                "skill": best_hit.skill_id
             }
         
         # Compute advantages
-        speed_adv = self._compute_advantage(player_team.avg_speed, enemy_team.avg_speed)
-        attack_adv = self._compute_advantage(player_team.avg_attack, enemy_team.avg_attack)
-        defense_adv = self._compute_advantage(player_team.avg_defense, enemy_team.avg_defense)
-        health_adv = self._compute_advantage(player_team.avg_health, enemy_team.avg_health)
+        player_count = player_team.character_count
+        enemy_count = enemy_team.character_count
+        speed_adv = self._compute_advantage(player_team.total_speed, player_count, enemy_team.total_speed, enemy_count)
+        attack_adv = self._compute_advantage(player_team.total_attack, player_count, enemy_team.total_attack, enemy_count)
+        defense_adv = self._compute_advantage(player_team.total_defense, player_count, enemy_team.total_defense, enemy_count)
+        health_adv = self._compute_advantage(player_team.total_health, player_count, enemy_team.total_health, enemy_count)
         
         # Generate key moments
         key_moments = self._generate_key_moments(battle, player_chars, enemy_chars, first_ko, biggest_hit)
@@ -233,7 +332,7 @@ class MetricsComputer:
             enemy_characters=enemy_chars,
             first_ko=first_ko,
             biggest_hit=biggest_hit,
-            turn_order=turn_order[:5],  # First 5 turns
+            turn_order=turn_order,
             speed_advantage=speed_adv,
             attack_advantage=attack_adv,
             defense_advantage=defense_adv,
@@ -241,45 +340,39 @@ class MetricsComputer:
             key_moments=key_moments
         )
     
-    def _init_character_metrics(self, characters: list) -> list:
-        """Initialize character metrics from parsed characters."""
-        metrics = []
-        for char in characters:
-            m = CharacterMetrics(
-                name=char.name,
-                team=char.team,
-                archetype=char.archetype,
-                level=char.level,
-                starting_health=char.max_health,
-                starting_attack=char.attack,
-                starting_defense=char.defense,
-                starting_speed=char.speed
-            )
-            metrics.append(m)
-        return metrics
-    
     def _compute_team_metrics(self, team_name: str, characters: list) -> TeamMetrics:
         """Compute aggregated team metrics."""
         if not characters:
             return TeamMetrics(team_name=team_name)
         
-        total_damage = sum(c.total_damage_dealt for c in characters)
-        total_taken = sum(c.total_damage_taken for c in characters)
-        total_healing = sum(c.total_healing_received for c in characters)
+        # Accumulate every total in a single pass over the team
+        total_damage = total_taken = total_healing = 0
+        sum_attack = sum_defense = sum_speed = sum_health = 0
+        total_turns = ko_count = total_buffs = total_debuffs = 0
+        archetypes = []
         
-        avg_attack = sum(c.starting_attack for c in characters) / len(characters)
-        avg_defense = sum(c.starting_defense for c in characters) / len(characters)
-        avg_speed = sum(c.starting_speed for c in characters) / len(characters)
-        avg_health = sum(c.starting_health for c in characters) / len(characters)
+        for c in characters:
+            total_damage += c.total_damage_dealt
+            total_taken += c.total_damage_taken
+            total_healing += c.total_healing_received
+            sum_attack += c.starting_attack
+            sum_defense += c.starting_defense
+            sum_speed += c.starting_speed
+            sum_health += c.starting_health
+            total_turns += c.turns_taken
+            total_buffs += c.buffs_received
+            total_debuffs += c.debuffs_received
+            if c.was_ko:
+                ko_count += 1
+            if c.archetype:
+                archetypes.append(c.archetype)
         
-        archetypes = [c.archetype for c in characters if c.archetype]
-        
-        total_turns = sum(c.turns_taken for c in characters)
-        ko_count = sum(1 for c in characters if c.was_ko)
-        alive_count = len(characters) - ko_count
-        
-        total_buffs = sum(c.buffs_received for c in characters)
-        total_debuffs = sum(c.debuffs_received for c in characters)
+        count = len(characters)
+        avg_attack = sum_attack / count
+        avg_defense = sum_defense / count
+        avg_speed = sum_speed / count
+        avg_health = sum_health / count
+        alive_count = count - ko_count
         
         return TeamMetrics(
             team_name=team_name,
@@ -290,7 +383,15 @@ class MetricsComputer:
             avg_defense=avg_defense,
             avg_speed=avg_speed,
             avg_health=avg_health,
-            character_count=len(characters),
+            avg_attack_r=round(avg_attack, 1),
+            avg_defense_r=round(avg_defense, 1),
+            avg_speed_r=round(avg_speed, 1),
+            avg_health_r=round(avg_health, 1),
+            total_attack=sum_attack,
+            total_defense=sum_defense,
+            total_speed=sum_speed,
+            total_health=sum_health,
+            character_count=count,
             archetypes=archetypes,
             total_turns=total_turns,
             characters_ko=ko_count,
@@ -299,19 +400,10 @@ class MetricsComputer:
             total_debuffs_received=total_debuffs
         )
     
-    def _compute_advantage(self, player_val: float, enemy_val: float) -> str:
-        """Determine which side has advantage."""
-        if player_val == 0 and enemy_val == 0:
-            return "even"
-        
-        diff_percent = ((player_val - enemy_val) / max(player_val, enemy_val)) * 100
-        
-        if diff_percent > 10:
-            return "player"
-        elif diff_percent < -10:
-            return "enemy"
-        else:
-            return "even"
+    def _compute_advantage(self, player_total: int, player_count: int,
+                           enemy_total: int, enemy_count: int) -> str:
+        """Determine which side has advantage (see _advantage)."""
+        return _advantage(player_total, player_count, enemy_total, enemy_count)
     
     def _generate_key_moments(self, battle: ParsedBattle, player_chars: list, 
                               enemy_chars: list, first_ko: dict, biggest_hit: dict) -> list:
@@ -338,7 +430,7 @@ class MetricsComputer:
         # Early deaths (turn 1-2)
         for ko in battle.ko_events:
             if ko.turn <= 2:
-                char_name = ko.character.replace('_l', '').replace('_r', '')
+                char_name = _strip(ko.character)
                 moments.append({
                     "turn": ko.turn,
                     "type": "early_death",
@@ -351,7 +443,10 @@ class MetricsComputer:
         return moments
 
 
+# MetricsComputer holds no per-battle state, so one instance serves every call
+_DEFAULT_COMPUTER = MetricsComputer()
+
+
 def compute_battle_metrics(battle: ParsedBattle) -> BattleMetrics:
     """Convenience function to compute metrics."""
-    computer = MetricsComputer()
-    return computer.compute(battle)
+    return _DEFAULT_COMPUTER.compute(battle)
@@ -0,0 +1,88 @@
+"""
+Response Cache Module
+Persists LLM responses on disk so identical battle prompts are not re-sent.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "combat_analyzer" / "responses.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
+
+
+class ResponseCache:
+    """SQLite-backed cache of chat completion responses keyed by request."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file to use. Defaults to ~/.cache/combat_analyzer.
+            ttl_seconds: How long a stored response stays valid.
+        """
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+        self._ready = False
+
+    @staticmethod
+    def make_key(request_body: dict) -> str:
+        """
+        Build a cache key from the full request body.
+
+        The body holds the model, system prompt, battle summary and sampling
+        parameters, so changing any of them naturally misses the cache.
+        """
+        canonical = json.dumps(request_body, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=32).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the cache table on first use."""
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None if missing/expired."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT content FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: Response cache unavailable: {e}")
+            return None
+
+        return row[0] if row else None
+
+    def set(self, key: str, content: str):
+        """Store a response for a key."""
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, content, expires_at) VALUES (?, ?, ?)",
+                        (key, content, time.time() + self.ttl_seconds)
+                    )
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: Could not write response cache: {e}")
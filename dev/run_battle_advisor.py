@@ -8,13 +8,10 @@ Usage:
     python run_battle_advisor.py --list         # List available battles
     python run_battle_advisor.py --battle 1     # Run battle #1
     python run_battle_advisor.py --sample       # Run sample battle
+    python -m battle_advisor                    # Same, as a module
 """
-import sys
-import os
-
-# Add current directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
+# Python puts this script's directory on sys.path, so battle_advisor imports
+# directly; `python -m battle_advisor` works the same way from this folder
 from battle_advisor.main import main
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+"""
+CSV Helper Tests
+Checks DATABASE.csv ingestion against small hand-written CSV files.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from combat_analyzer.csv_helper import CSVDataLoader, DATABASE_CSV
+
+
+GROUP_ROW = "SKILLS,,,,,ATTRIBUTES,,,BASE STATS\n"
+
+
+class DatabaseColumnsTest(unittest.TestCase):
+    """Column handling when reading DATABASE.csv."""
+
+    def _load(self, text: str) -> CSVDataLoader:
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, DATABASE_CSV).write_text(GROUP_ROW + text, encoding="utf-8")
+            loader = CSVDataLoader(tmp, use_cache=False)
+            loader.load_all()
+        return loader
+
+    def test_missing_optional_column_keeps_rows(self):
+        # No 'Theme 2', 'Rarity' or stat columns
+        loader = self._load(
+            "Ref. Character,Skill ID,Skill Name,Skill Level,Character ID,Theme,Archetype\n"
+            "King Daffy,skill_kings_capital_1,King's Capital,1,daffy_duck_king,Imperial,Attacker\n"
+            "King Daffy,skill_kings_capital_2,King's Capital,2,daffy_duck_king,Imperial,Attacker\n"
+        )
+
+        character = loader.get_character("daffy_duck_king")
+        self.assertIsNotNone(character)
+        self.assertEqual(character.display_name, "King Daffy")
+        self.assertEqual(character.archetype, "Attacker")
+        self.assertEqual(character.theme2, "")
+        self.assertEqual(character.rarity, "")
+        self.assertEqual(character.base_attack, 0)
+
+        skills = loader.get_character_skills("daffy_duck_king")
+        self.assertEqual([s.skill_level for s in skills], [1, 2])
+        self.assertEqual(skills[0].description, "")
+
+    def test_missing_character_id_column_loads_nothing(self):
+        loader = self._load(
+            "Ref. Character,Skill ID,Skill Name\n"
+            "King Daffy,skill_kings_capital_1,King's Capital\n"
+        )
+
+        self.assertEqual(loader._characters, {})
+        self.assertEqual(loader._skills, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+LLM Analyzer Tests
+Checks how battle summaries are compacted for the prompt.
+"""
+import unittest
+
+from combat_analyzer.llm_analyzer import compact_summary
+
+
+class CompactSummaryTest(unittest.TestCase):
+    """Pruning rules of compact_summary."""
+
+    def test_drops_missing_values(self):
+        summary = {"result": "WIN", "a": None, "b": "", "c": {}, "d": [], "e": {"f": None}}
+        self.assertEqual(compact_summary(summary), {"result": "WIN"})
+
+    def test_keeps_zeros_and_false(self):
+        summary = {
+            "totals": {"characters_alive": 0, "had_first_turn": False},
+            "performance": {"damage_dealt": 0, "final_health_percent": 0.0, "was_ko": True}
+        }
+        self.assertEqual(compact_summary(summary), summary)
+
+    def test_prunes_inside_lists(self):
+        summary = {"characters": [{"name": "bugs_bunny", "ko_turn": None, "turns_taken": 0}]}
+        self.assertEqual(
+            compact_summary(summary),
+            {"characters": [{"name": "bugs_bunny", "turns_taken": 0}]}
+        )
+
+    def test_drops_verbose_db_info_fields(self):
+        summary = {"db_info": {"description": "Long text", "region": "Acme", "race": "Rabbit",
+                               "rarity": "Epic"}}
+        self.assertEqual(compact_summary(summary), {"db_info": {"rarity": "Epic"}})
+
+    def test_turn_order_only_when_requested(self):
+        summary = {"key_events": {"first_ko": {"turn": 3}, "turn_order": [{"turn": 1}]}}
+        self.assertEqual(compact_summary(summary), {"key_events": {"first_ko": {"turn": 3}}})
+        self.assertEqual(compact_summary(summary, include_turn_order=True), summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
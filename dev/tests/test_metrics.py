@@ -0,0 +1,106 @@
+"""
+Metrics Tests
+Checks metrics computed from small hand-built battles.
+"""
+import unittest
+
+from combat_analyzer.battle_parser import (
+    BattleResult, CharacterStats, DamageEvent, KOEvent, ParsedBattle, TurnEvent
+)
+from combat_analyzer.metrics import compute_battle_metrics
+
+
+def make_battle(left_team: list, right_team: list, turns: list = (),
+                damage_events: list = (), ko_events: list = ()) -> ParsedBattle:
+    """A won battle between two teams of CharacterStats with the given events."""
+    return ParsedBattle(
+        seed=0,
+        game_mode="test",
+        left_team=left_team,
+        right_team=right_team,
+        turns=list(turns),
+        damage_events=list(damage_events),
+        heal_events=[],
+        ko_events=list(ko_events),
+        buff_debuff_events=[],
+        result=BattleResult(won=True, winner_team="Team1", total_turns=len(turns), stars=3)
+    )
+
+
+def speed_battle(left_speeds: list, right_speeds: list) -> ParsedBattle:
+    """A battle with no events between teams of the given speeds."""
+    def team(side: str, speeds: list) -> list:
+        return [CharacterStats(name=f"{side.lower()}_{i}", team=side, speed=speed)
+                for i, speed in enumerate(speeds)]
+
+    return make_battle(team("LEFT", left_speeds), team("RIGHT", right_speeds))
+
+
+class StatAdvantageTest(unittest.TestCase):
+    """The 10% threshold for stat advantages."""
+
+    def test_exactly_ten_percent_with_unequal_team_sizes_is_even(self):
+        # Averages 374/3 = 124.67 and 561/5 = 112.2: exactly 10% apart
+        metrics = compute_battle_metrics(speed_battle([124, 125, 125], [112, 112, 112, 112, 113]))
+        self.assertEqual(metrics.speed_advantage, "even")
+
+        metrics = compute_battle_metrics(speed_battle([112, 112, 112, 112, 113], [124, 125, 125]))
+        self.assertEqual(metrics.speed_advantage, "even")
+
+    def test_just_over_ten_percent_with_unequal_team_sizes(self):
+        # Averages 375/3 = 125 and 561/5 = 112.2: 10.24% apart
+        metrics = compute_battle_metrics(speed_battle([125, 125, 125], [112, 112, 112, 112, 113]))
+        self.assertEqual(metrics.speed_advantage, "player")
+
+        metrics = compute_battle_metrics(speed_battle([112, 112, 112, 112, 113], [125, 125, 125]))
+        self.assertEqual(metrics.speed_advantage, "enemy")
+
+    def test_all_zero_stats_are_even(self):
+        metrics = compute_battle_metrics(speed_battle([0, 0], [0]))
+        self.assertEqual(metrics.speed_advantage, "even")
+
+
+
+class EventNameTest(unittest.TestCase):
+    """Matching event names (with _l/_r side suffixes) to characters."""
+
+    def test_inner_side_marker_in_name_is_kept(self):
+        # "road_runner" contains "_r" and "pepe_le_pew" contains "_l"; only
+        # the trailing side suffix may be removed from event names
+        battle = make_battle(
+            [CharacterStats(name="road_runner", team="LEFT")],
+            [CharacterStats(name="pepe_le_pew", team="RIGHT")],
+            turns=[
+                TurnEvent(turn_number=1, owner="road_runner_l"),
+                TurnEvent(turn_number=2, owner="pepe_le_pew_r"),
+                TurnEvent(turn_number=3, owner="road_runner_l")
+            ],
+            damage_events=[
+                DamageEvent(turn=1, attacker="road_runner_l", target="pepe_le_pew_r",
+                            skill_id="skill_1", damage=40, attacker_attack=10,
+                            target_defense=5, skill_power="100%"),
+                DamageEvent(turn=3, attacker="road_runner_l", target="pepe_le_pew_r",
+                            skill_id="skill_1", damage=60, attacker_attack=10,
+                            target_defense=5, skill_power="100%")
+            ],
+            ko_events=[KOEvent(turn=3, character="pepe_le_pew_r")]
+        )
+
+        metrics = compute_battle_metrics(battle)
+        runner = metrics.player_characters[0]
+        pepe = metrics.enemy_characters[0]
+
+        self.assertEqual(runner.total_damage_dealt, 100)
+        self.assertEqual(runner.turns_taken, 2)
+        self.assertEqual(runner.first_turn_number, 1)
+        self.assertEqual(pepe.total_damage_taken, 100)
+        self.assertEqual(pepe.turns_taken, 1)
+        self.assertTrue(pepe.was_ko)
+        self.assertEqual(pepe.ko_turn, 3)
+        self.assertEqual(metrics.first_ko["character"], "pepe_le_pew")
+        self.assertEqual(metrics.biggest_hit["attacker"], "road_runner")
+        self.assertEqual(metrics.biggest_hit["target"], "pepe_le_pew")
+
+
+if __name__ == "__main__":
+    unittest.main()